@@ -1,4 +1,5 @@
 import polars as pl
+import polars.selectors as ps
 import os 
 import time 
 
@@ -9,6 +10,7 @@ output_var = [
     'Inflation',
     'Unemployment',
     'Budget Balance',
+    'Approval Index',
 ]
 
 input_var = [
@@ -21,6 +23,28 @@ input_var = [
 
 rootdir = './raw-data/'
 
+# Row groups are kept small so the per-row-group min/max statistics written
+# alongside the cleaned parquet stay selective for scan_parquet predicates.
+# Rows are sorted by Interest Rate within each country-period so that
+# filters such as `Interest Rate <= 8` skip whole row groups.
+ROW_GROUP_SIZE = 100_000
+
+def clean(df):
+    """Drop rows with infinite or null values and check the expected columns.
+
+    Infinite values are dropped in every float column, Float32 Approval Index
+    included, and rows with nulls are dropped for every consumer.
+    """
+    missing = [col for col in ["country", "period", *input_var, *output_var] if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing expected columns: {missing}")
+    
+    return df.filter(
+        ~pl.any_horizontal(ps.float().is_infinite())
+    ).drop_nulls().sort(
+        "country", "period", "Interest Rate", maintain_order=True
+    )
+
 main_subfolder = ["Constants", "Random"]
 
 final_df = pl.DataFrame()
@@ -52,6 +76,14 @@ for subfolder in main_subfolder:
             
     final_df = pl.concat(lazy_frames, how="vertical").collect()
     final_df.write_parquet(f"{subfolder}_prelim.parquet")
+    
+    clean_df = clean(final_df)
+    clean_df.write_parquet(
+        f"{subfolder}_clean.parquet",
+        row_group_size=ROW_GROUP_SIZE,
+        statistics=True,
+    )
+    print(f"Removed {final_df.shape[0] - clean_df.shape[0]} invalid rows from {subfolder}")
     print(f"Finished {subfolder}")
     
 end = time.time()
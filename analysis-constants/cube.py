@@ -0,0 +1,277 @@
+import polars as pl
+import numpy as np
+import os
+import sys
+import time
+from itertools import combinations
+
+pl.Config().set_tbl_cols(-1)
+
+# Configuration
+CONFIG = {
+    'data_file': './Constants_clean.parquet',
+    'cube_file': './analysis-constants/cube.parquet',
+    'output_variables': [
+        'Real GDP Growth', 'Inflation', 'Unemployment',
+        'Budget Balance', 'Approval Index'
+    ],
+    'input_variables': [
+        'Interest Rate', 'Vat Rate', 'Corporate Tax',
+        'Government Expenditure', 'Import Tariff'
+    ],
+    # Rows whose Float64 values fall outside these bounds are dropped before
+    # aggregating, the same row selection as regression_filter_interest.py.
+    # None keeps every cleaned row.
+    'value_bounds': (-20, 100),
+    # Bin width of each input in the cell key; None drops the input from the
+    # key. Import Tariff steps on every row, so keying on it would leave one
+    # raw row per cell.
+    'cube_bin_widths': {
+        'Interest Rate': 1,
+        'Vat Rate': 1,
+        'Corporate Tax': 1,
+        'Government Expenditure': 1,
+        'Import Tariff': None,
+    },
+}
+
+BINNED_INPUTS = [var for var, width in CONFIG['cube_bin_widths'].items() if width is not None]
+
+KEYS = ['country', 'period', *BINNED_INPUTS]
+
+# Inputs then outputs: the Gram matrix of [1, inputs, outputs] holds X'X, X'y
+# and y'y, so every sub-grid regression and distribution is a sum over cells.
+VARIABLES = [*CONFIG['input_variables'], *CONFIG['output_variables']]
+
+OUTPUT_PAIRS = list(combinations(CONFIG['output_variables'], 2))
+
+
+def sum_column(a, b=None):
+    """Name of the cube column holding sum(a) or sum(a * b)."""
+    if b is None:
+        return f"{a}_sum"
+    if a == b:
+        return f"{a}_sum_sq"
+    return f"{a}_x_{b}_sum"
+
+
+def build_cube(lf):
+    """Aggregate raw rows into one row per (country, period, input bin).
+
+    Each cell stores the row count and the sums of every input and output and
+    of every product of two of them (sum x, sum xx', sum xy, sum y, sum y^2,
+    sum yy'), which is enough to rebuild X'X, X'y and y'y for any union of
+    cells. Bin keys hold the lower edge of the bin.
+    """
+    if CONFIG['value_bounds'] is not None:
+        lf = lf.filter(pl.col(pl.Float64).is_between(*CONFIG['value_bounds']))
+
+    lf = lf.with_columns(pl.col(VARIABLES).cast(pl.Float64))
+
+    keys = [pl.col('country'), pl.col('period')] + [
+        ((pl.col(var) // width) * width).alias(f"{var}_bin")
+        for var, width in CONFIG['cube_bin_widths'].items() if width is not None
+    ]
+
+    aggs = [pl.len().alias('n_rows')]
+    aggs += [pl.col(var).sum().alias(sum_column(var)) for var in VARIABLES]
+    aggs += [
+        (pl.col(a) * pl.col(b)).sum().alias(sum_column(a, b))
+        for i, a in enumerate(VARIABLES) for b in VARIABLES[i:]
+    ]
+
+    return lf.group_by(keys).agg(aggs).rename(
+        {f"{var}_bin": var for var in BINNED_INPUTS}
+    ).sort(KEYS).collect()
+
+
+def load_cube():
+    """Load the cube written by `main`."""
+    return pl.read_parquet(CONFIG['cube_file'])
+
+
+def filter_cube(cube, filters=()):
+    """Restrict the cube to a sub-grid.
+
+    Only predicates on the cube keys are allowed, and they are evaluated on
+    the lower edge of each bin, so they are exact when they fall on bin
+    boundaries. A predicate on an output, or on an input dropped from the
+    key, would need the raw rows, which the cube no longer has.
+    """
+    for expr in filters:
+        unknown = set(expr.meta.root_names()) - set(KEYS)
+        if unknown:
+            raise ValueError(f"Cube filters can only use {KEYS}, got {sorted(unknown)}")
+    return cube.filter(*filters) if filters else cube
+
+
+def query_distribution(cube, by=('country', 'period'), filters=()):
+    """Count, mean, standard deviation and pairwise correlation of the outputs."""
+    cube = filter_cube(cube, filters)
+    sum_cols = [c for c in cube.columns if c not in KEYS and c != 'n_rows']
+    totals = cube.group_by(list(by)).agg(pl.col('n_rows').sum(), pl.col(sum_cols).sum())
+
+    def var(name):
+        return (
+            (pl.col(f"{name}_sum_sq") - pl.col(f"{name}_sum") ** 2 / pl.col('n_rows'))
+            / (pl.col('n_rows') - 1)
+        )
+
+    def cov(a, b):
+        return (
+            (pl.col(f"{a}_x_{b}_sum") - pl.col(f"{a}_sum") * pl.col(f"{b}_sum") / pl.col('n_rows'))
+            / (pl.col('n_rows') - 1)
+        )
+
+    stats = [pl.col('n_rows')]
+    for name in CONFIG['output_variables']:
+        stats.append((pl.col(f"{name}_sum") / pl.col('n_rows')).alias(f"{name}_mean"))
+        stats.append(var(name).sqrt().alias(f"{name}_std"))
+    for a, b in OUTPUT_PAIRS:
+        stats.append((cov(a, b) / (var(a) * var(b)).sqrt()).alias(f"{a}_x_{b}_corr"))
+
+    return totals.select(*by, *stats).sort(list(by))
+
+
+def gram_matrix(cells):
+    """Sum the cells' statistics into the Gram matrix of [1, inputs, outputs]."""
+    totals = cells.select(pl.exclude(KEYS).sum()).row(0, named=True)
+
+    size = len(VARIABLES) + 1
+    G = np.empty((size, size))
+    G[0, 0] = totals['n_rows']
+    for i, a in enumerate(VARIABLES, start=1):
+        G[0, i] = G[i, 0] = totals[sum_column(a)]
+        for j, b in enumerate(VARIABLES[i - 1:], start=i):
+            G[i, j] = G[j, i] = totals[sum_column(a, b)]
+    return G
+
+
+def regress_cell_group(cells):
+    """OLS of every output on the inputs for one country-period, from its cells."""
+    from scipy import stats
+
+    k = len(CONFIG['input_variables']) + 1  # +1 for the constant
+    G = gram_matrix(cells)
+
+    n_total = G[0, 0]
+    XtX = G[:k, :k]
+    XtY = G[:k, k:]
+    SS = np.diag(G[k:, k:])
+    S = G[0, k:]
+
+    XtX_inv = np.linalg.pinv(XtX)
+    beta = XtX_inv @ XtY
+
+    rank = np.linalg.matrix_rank(XtX)
+    df_model = rank - 1
+    df_resid = n_total - rank
+
+    sse = SS - (beta * XtY).sum(axis=0)
+    sst = SS - S ** 2 / n_total
+    r_squared = 1 - sse / sst
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        se = np.sqrt(np.outer(np.diag(XtX_inv), sse / df_resid))
+        pvalues = 2 * stats.t.sf(np.abs(beta / se), df_resid)
+        f_stat = ((sst - sse) / df_model) / (sse / df_resid)
+        f_pvalues = stats.f.sf(f_stat, df_model, df_resid)
+
+    return int(n_total), beta, pvalues, r_squared, f_pvalues
+
+
+def regress(cube, filters=()):
+    """Regress every output on the inputs per country-period over a sub-grid.
+
+    Produces the plain OLS columns of regression_filter_interest.py (not the
+    HC and bootstrap columns, which need the raw rows), but only reads the
+    cube. With CONFIG['value_bounds'] at its default, filtering on
+    `Interest Rate <= 8` reproduces that script's fits.
+    """
+    cube = filter_cube(cube, filters)
+
+    results = []
+    for (country, period), cells in cube.group_by(['country', 'period']):
+        n_rows, beta, pvalues, r_squared, f_pvalues = regress_cell_group(cells)
+
+        for j, var in enumerate(CONFIG['output_variables']):
+            result = {
+                'country': country,
+                'period': period,
+                'output_variable': var,
+                'n_rows': n_rows,
+                'r_squared': r_squared[j],
+                'prob_f_stat': 0.0 if f_pvalues[j] <= 1e-4 else f_pvalues[j],
+                'intercept_coef': beta[0, j],
+            }
+
+            for i, input_var in enumerate(CONFIG['input_variables']):
+                idx = i + 1  # +1 to account for constant
+                result[f"{input_var}_coef"] = beta[idx, j]
+                result[f"{input_var}_pvalue"] = 0.0 if pvalues[idx, j] <= 1e-4 else pvalues[idx, j]
+
+            results.append(result)
+
+    return pl.DataFrame(results).sort('country', 'period', 'output_variable')
+
+
+def main():
+    start = time.time()
+
+    cube = build_cube(pl.scan_parquet(CONFIG['data_file']))
+    os.makedirs(os.path.dirname(CONFIG['cube_file']), exist_ok=True)
+    cube.write_parquet(CONFIG['cube_file'])
+
+    n_raw = cube['n_rows'].sum()
+    raw_size = os.path.getsize(CONFIG['data_file'])
+    cube_size = os.path.getsize(CONFIG['cube_file'])
+    print(f"Built cube with {cube.shape[0]} cells from {n_raw} rows ({n_raw / cube.shape[0]:.1f} rows per cell)")
+    print(f"Cube is {cube_size} bytes against {raw_size} bytes of raw parquet ({raw_size / cube_size:.1f}x smaller)")
+    print(f"Time elapsed: {time.time() - start} seconds")
+
+    return cube
+
+
+def check_against_statsmodels(seed=0):
+    """Compare `regress` on a synthetic country-period with statsmodels OLS."""
+    import statsmodels.api as sm
+
+    rng = np.random.default_rng(seed)
+    grid = np.array(np.meshgrid(
+        np.arange(0, 11), np.arange(5, 8), np.arange(20, 23), np.arange(1, 4), np.arange(0, 10),
+    )).reshape(5, -1).T.astype(np.float64)
+    raw = pl.DataFrame(grid, schema=CONFIG['input_variables']).with_columns(
+        pl.lit('synthetic').alias('country'),
+        pl.lit(1).alias('period'),
+        *[
+            pl.Series(var, 40 + grid @ rng.normal(size=5) + rng.normal(scale=10, size=len(grid)))
+            for var in CONFIG['output_variables']
+        ],
+    ).with_columns(pl.col('Approval Index').cast(pl.Float32))
+
+    filters = [pl.col('Interest Rate') <= 8]
+    from_cube = regress(build_cube(raw.lazy()), filters)
+
+    rows = raw.filter(*filters)
+    if CONFIG['value_bounds'] is not None:
+        rows = rows.filter(pl.col(pl.Float64).is_between(*CONFIG['value_bounds']))
+    X = sm.add_constant(rows.select(CONFIG['input_variables']).to_numpy())
+
+    for var in CONFIG['output_variables']:
+        model = sm.OLS(rows[var].cast(pl.Float64).to_numpy(), X).fit()
+        cube_row = from_cube.filter(pl.col('output_variable') == var).row(0, named=True)
+        cube_coefs = [cube_row['intercept_coef']] + [
+            cube_row[f"{input_var}_coef"] for input_var in CONFIG['input_variables']
+        ]
+        assert cube_row['n_rows'] == rows.shape[0], var
+        assert np.allclose(cube_coefs, model.params, rtol=1e-6, atol=1e-8), var
+        assert np.isclose(cube_row['r_squared'], model.rsquared, rtol=1e-6), var
+
+    print(f"Cube regression matches statsmodels on {rows.shape[0]} synthetic rows")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ['check']:
+        check_against_statsmodels()
+    else:
+        main()
@@ -2,6 +2,7 @@ import polars as pl
 import seaborn as sns
 import matplotlib.pyplot as plt
 import os
+import results_store
 
 pl.Config().set_tbl_cols(-1)
 
@@ -23,26 +24,35 @@ input_var = [
 
 input_var_coef = [var + "_coef" for var in input_var]
 
-df = pl.read_parquet("analysis-constants/regression_filter_interest.parquet").with_columns(
-    pl.when(pl.col("r_squared") < 0).then(0).otherwise(pl.col("r_squared")).alias("r_squared"),
-)
+TABLE = 'regression_filter_interest'
 
-print(df)
+# Resolved once, so a run written while the report runs is not mixed in
+RUN_ID = results_store.latest_run(TABLE)
 
-col_to_unpivot = df.select(pl.exclude("country", "period", "output_variable")).columns
-df_long = df.unpivot(
-    col_to_unpivot,
-    index=['country', 'period', 'output_variable'],
+def load_country(country, columns, output_variable=None):
+    """Results of RUN_ID for one country, in long format."""
+    df = results_store.query(
+        TABLE, country=country, output_variable=output_variable, run_id=RUN_ID, columns=columns
     )
+    
+    if "r_squared" in columns:
+        df = df.with_columns(
+            pl.when(pl.col("r_squared") < 0).then(0).otherwise(pl.col("r_squared")).alias("r_squared"),
+        )
+    
+    return df.unpivot(
+        columns,
+        index=['country', 'period', 'output_variable'],
+    )
+
+print(results_store.list_runs(TABLE))
+print(f"Reporting run {RUN_ID}")
 
-unique_countries = df_long.select(pl.col("country")).unique().to_series()
+unique_countries = results_store.countries(TABLE, run_id=RUN_ID)
 
 for country in unique_countries:
     
-    df_filter = df_long.filter(
-        pl.col('country') == country,
-        pl.col('variable') == 'r_squared',
-    ).sort('output_variable')
+    df_filter = load_country(country, ['r_squared']).sort('output_variable')
     
     print(f"Done filtering {country} for r_squared")
     
@@ -82,11 +92,7 @@ for country in unique_countries:
 
 for country in unique_countries:
     for var in output_var:
-        df_filter = df_long.filter(
-            pl.col('country') == country,
-            pl.col('output_variable') == var,
-            pl.col('variable').is_in(input_var_coef)
-        ).sort('period')
+        df_filter = load_country(country, input_var_coef, output_variable=var).sort('period')
         
         print(f"Done filtering {country} for coef of {var}")
         
@@ -1,20 +1,17 @@
-import pandas as pd
 import polars as pl
-from polars import selectors as ps
-import statsmodels.api as sm
 import os
-import numpy as np
-from matplotlib import pyplot as plt
-import datashader as ds
-import colorcet as cc
-from datashader import transfer_functions as tf
+
+# statsmodels and the plotting stack (pandas, matplotlib, datashader, colorcet)
+# are imported inside the functions that use them to keep startup fast.
 
 # Configuration
 CONFIG = {
     'output_viz_dir': './analysis-constants/visualization/cooks-distance/',
     'output_sum_dir': './analysis-constants/',
-    'data_file': './Constants_prelim.parquet',
+    'data_file': './Constants_clean.parquet',
     'outlier_iqr_threshold': 10,
+    'bootstrap_replicates': 1000,
+    'bootstrap_seed': 0,
     'output_variables': [
         'Real GDP Growth', 'Inflation', 'Unemployment', 
         'Budget Balance', 'Approval Index'
@@ -26,11 +23,10 @@ CONFIG = {
 }
 
 def load_data():
-    """Load and clean initial data."""
-    df = pl.read_parquet(CONFIG['data_file'])
-    return df.with_columns(
-    pl.col(pl.Float64).replace([float('inf'), -float('inf')], None)
-    ).drop_nulls()
+    """Load the cleaned data written by aggregate_csv.py, only the columns used."""
+    return pl.scan_parquet(CONFIG['data_file']).select(
+        'country', 'period', *CONFIG['input_variables'], *CONFIG['output_variables']
+    ).collect()
 
 def get_unique_combinations(df):
     """Get unique country-period combinations."""
@@ -59,6 +55,8 @@ def filter_outliers(df, variables, n_iqr=10):
 
 def calculate_all_cooks_distances(df, input_vars, output_vars):
     """Calculate Cook's distance for all output variables."""
+    import statsmodels.api as sm
+    
     X_pd = df.select(input_vars).to_pandas()
     
     cooks_distances = {}
@@ -70,6 +68,12 @@ def calculate_all_cooks_distances(df, input_vars, output_vars):
     return cooks_distances
 def plot_cooks_distance(cooks_d, output_var, country, period, out_dir, cutoff):
     """Create and save a Cook's distance plot."""
+    import pandas as pd
+    import colorcet as cc
+    import datashader as ds
+    from datashader import transfer_functions as tf
+    from matplotlib import pyplot as plt
+    
     # Create directory if it doesn't exist
     os.makedirs(out_dir, exist_ok=True)
     
@@ -104,8 +108,8 @@ def plot_cooks_distance(cooks_d, output_var, country, period, out_dir, cutoff):
     fig.savefig(plot_path, dpi=72, bbox_inches='tight', pad_inches=0.1)
     plt.close(fig)
     
-def process_country_period(df, country, period):
-    """Process a single country-period combination."""
+def filter_country_period(df, country, period, plot=False):
+    """Select a country-period and drop outliers and influential points."""
     print(f"Processing {country} - {period}")
     
     # Filter data for specific country and period
@@ -133,9 +137,10 @@ def process_country_period(df, country, period):
         df_filtered = df_filtered.with_columns(
             pl.Series(f"cooks_{output_var}", distances).cast(pl.Float32)
         )
-        # plot_cooks_distance(
-        #     distances, output_var, country, period, cook_output_viz_dir, cooks_cutoff
-        # )
+        if plot:
+            plot_cooks_distance(
+                distances, output_var, country, period, cook_output_viz_dir, cooks_cutoff
+            )
     
     # Filter influential points
     for output_var in CONFIG['output_variables']:
@@ -143,7 +148,12 @@ def process_country_period(df, country, period):
     
     print(f"Removed {filtered_count - df_filtered.shape[0]} influential points")
     
-    # Fit final models and collect results
+    return df_filtered
+
+def fit_models(df_filtered, country, period):
+    """Fit the final OLS models for a filtered country-period."""
+    import statsmodels.api as sm
+    
     results = []
     for output_var in CONFIG['output_variables']:
         X = df_filtered.select(CONFIG['input_variables']).to_pandas()
@@ -171,19 +181,73 @@ def process_country_period(df, country, period):
     
     return pl.DataFrame(results)
 
+def process_country_period(df, country, period, plot=False):
+    """Process a single country-period combination."""
+    df_filtered = filter_country_period(df, country, period, plot)
+    return fit_models(df_filtered, country, period)
+
+def group_arrays(df_filtered, country, period):
+    """Key and input/output arrays of a filtered country-period for resampling."""
+    return (
+        {'country': country, 'period': period},
+        df_filtered.select(CONFIG['input_variables']).to_numpy(),
+        df_filtered.select(CONFIG['output_variables']).to_numpy(),
+    )
+
+def resample_groups(groups, executor=None):
+    """HC0-HC3 standard errors and bootstrap intervals for the given groups."""
+    import resampling
+    
+    results = resampling.run_groups(
+        groups,
+        CONFIG['input_variables'],
+        CONFIG['output_variables'],
+        n_boot=CONFIG['bootstrap_replicates'],
+        seed=CONFIG['bootstrap_seed'],
+        executor=executor,
+    )
+    return pl.DataFrame(results)
+
+def run_combinations(df, combinations, plot=False, robust=True, executor=None):
+    """Filter and fit each country-period, adding the robust columns if asked.
+    
+    Each filtered group is handed to the resampling pool as soon as it is
+    ready, so the filtered frames are never all held at once.
+    """
+    if not robust:
+        result_dfs = [
+            process_country_period(df, country, period, plot)
+            for country, period in combinations
+        ]
+        return pl.concat(result_dfs, how="vertical")
+    
+    result_dfs = []
+    
+    def groups():
+        for country, period in combinations:
+            df_filtered = filter_country_period(df, country, period, plot)
+            result_dfs.append(fit_models(df_filtered, country, period))
+            yield group_arrays(df_filtered, country, period)
+    
+    robust_df = resample_groups(groups(), executor)
+    
+    return pl.concat(result_dfs, how="vertical").join(
+        robust_df,
+        on=['country', 'period', 'output_variable'],
+        how='left',
+    )
+
 def main():
+    import results_store
+    
     # Load and prepare data
     df = load_data()
     
-    # Process each country-period combination
-    result_dfs = []
-    for country, period in get_unique_combinations(df):
-        result_df = process_country_period(df, country, period)
-        result_dfs.append(result_df)
-    
-    # Combine results
-    final_df = pl.concat(result_dfs, how="vertical")
+    # Process each country-period combination, with robust standard errors
+    # and bootstrap intervals
+    final_df = run_combinations(df, get_unique_combinations(df))
     final_df.sort(['country', 'period', 'output_variable']).write_csv(os.path.join(CONFIG['output_sum_dir'], "regression.csv"))
+    results_store.write_results(final_df, 'regression', CONFIG)
     print(final_df)
     
     return final_df
@@ -2,6 +2,8 @@ import polars as pl
 import pandas as pd
 import statsmodels.api as sm
 import os
+import resampling
+import results_store
 
 pl.Config().set_tbl_cols(-1)
 
@@ -21,50 +23,87 @@ input_var = [
     'Import Tariff'
 ]
 
-df = pl.read_parquet("Constants_prelim.parquet").with_columns(
-    pl.col(pl.Float64).replace([float('inf'), -float('inf')], None)
-).drop_nulls().filter(
-    pl.col("Interest Rate") <= 8,
-    pl.col(pl.Float64).is_between(-20, 100),
-)
+CONFIG = {
+    'data_file': 'Constants_clean.parquet',
+    'output_file': 'analysis-constants/regression_filter_interest.parquet',
+    'max_interest_rate': 8,
+    'value_bounds': (-20, 100),
+    'bootstrap_replicates': 1000,
+    'bootstrap_seed': 0,
+    'input_variables': input_var,
+    'output_variables': output_var,
+}
 
-unique = df.select(['country', 'period']).unique().rows()
+def main():
+    df = pl.scan_parquet(CONFIG['data_file']).filter(
+        pl.col("Interest Rate") <= CONFIG['max_interest_rate'],
+        pl.col(pl.Float64).is_between(*CONFIG['value_bounds']),
+    ).collect()
+    
+    unique = df.select(['country', 'period']).unique().rows()
+    
+    results = []
+    
+    for country, period in unique:
+        for var in output_var:
+            
+            df_unique = df.filter(
+                (pl.col("country") == country) & 
+                (pl.col("period") == period)
+            )
+            
+            X = df_unique.select(input_var).to_pandas()
+            X = sm.add_constant(X)
+            y = df_unique.select(var).to_pandas()
+            model = sm.OLS(y, X).fit()
+            
+            print(f"Done regression for {country} - {period} - {var}")
+            
+            result = {
+                'country': country,
+                'period': period,
+                'output_variable': var,
+                'n_rows': df_unique.shape[0],
+                'r_squared': model.rsquared,
+                'prob_f_stat': 0.0 if model.f_pvalue <= 1e-4 else model.f_pvalue,
+                'intercept_coef': model.params["const"],
+            }
+            
+            for i, var in enumerate(input_var):
+                idx = i+1
+                result[f"{var}_coef"] = model.params.iloc[idx]
+                result[f"{var}_pvalue"] = 0.0 if model.pvalues.iloc[idx] <= 1e-4 else model.pvalues.iloc[idx]
+    
+            print(f"Done collecting results for {country} - {period} - {var}")
+            
+            results.append(result)
+            
+    final_df = pl.DataFrame(results)
+    
+    # Add HC0-HC3 standard errors and bootstrap confidence intervals
+    def groups():
+        for country, period in unique:
+            df_unique = df.filter(
+                (pl.col("country") == country) & 
+                (pl.col("period") == period)
+            )
+            yield (
+                {'country': country, 'period': period},
+                df_unique.select(input_var).to_numpy(),
+                df_unique.select(output_var).to_numpy(),
+            )
+    
+    robust_df = pl.DataFrame(resampling.run_groups(
+        groups(),
+        input_var,
+        output_var,
+        n_boot=CONFIG['bootstrap_replicates'],
+        seed=CONFIG['bootstrap_seed'],
+    ))
+    
+    final_df = final_df.join(robust_df, on=['country', 'period', 'output_variable'], how='left')
+    final_df.sort("country", "period", "output_variable").write_parquet(CONFIG['output_file'])
+    results_store.write_results(final_df, 'regression_filter_interest', CONFIG)
 
-results = []
-
-for country, period in unique:
-    for var in output_var:
-        
-        df_unique = df.filter(
-            (pl.col("country") == country) & 
-            (pl.col("period") == period)
-        )
-        
-        X = df_unique.select(input_var).to_pandas()
-        X = sm.add_constant(X)
-        y = df_unique.select(var).to_pandas()
-        model = sm.OLS(y, X).fit()
-        
-        print(f"Done regression for {country} - {period} - {var}")
-        
-        result = {
-            'country': country,
-            'period': period,
-            'output_variable': var,
-            'n_rows': df_unique.shape[0],
-            'r_squared': model.rsquared,
-            'prob_f_stat': 0.0 if model.f_pvalue <= 1e-4 else model.f_pvalue,
-            'intercept_coef': model.params["const"],
-        }
-        
-        for i, var in enumerate(input_var):
-            idx = i+1
-            result[f"{var}_coef"] = model.params.iloc[idx]
-            result[f"{var}_pvalue"] = 0.0 if model.pvalues.iloc[idx] <= 1e-4 else model.pvalues.iloc[idx]
-
-        print(f"Done collecting results for {country} - {period} - {var}")
-        
-        results.append(result)
-        
-final_df = pl.DataFrame(results)
-final_df.sort("country", "period", "output_variable").write_parquet("analysis-constants/regression_filter_interest.parquet")
+if __name__ == "__main__":
+    main()
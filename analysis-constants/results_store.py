@@ -0,0 +1,160 @@
+import polars as pl
+import fcntl
+import hashlib
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Append-only store for regression results. Each run of a table is written as
+# one parquet file per country and output variable under
+#   <root>/<table>/run_id=<run_id>/country=<country>/output_variable=<var>/results.parquet
+# sorted by period, and every file is recorded in <root>/<table>/_index.parquet
+# together with the run metadata. Queries read the small index first and only
+# open the files for the requested run, country and output variable.
+
+RESULTS_ROOT = './analysis-constants/results/'
+
+SORT_KEYS = ['country', 'period', 'output_variable']
+
+
+def config_hash(config):
+    """Stable short hash of a run configuration."""
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+
+def index_path(table, root=RESULTS_ROOT):
+    return os.path.join(root, table, '_index.parquet')
+
+
+@contextmanager
+def index_lock(table, root=RESULTS_ROOT):
+    """Exclusive lock around a read-modify-write of the table's index."""
+    with open(os.path.join(root, table, '_index.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load_index(table, root=RESULTS_ROOT):
+    """One row per (run, country, output variable) partition of the table."""
+    path = index_path(table, root)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No results stored for '{table}' under {root}")
+    return pl.read_parquet(path)
+
+
+def write_results(df, table, config, root=RESULTS_ROOT):
+    """Store a run's results and return its run id."""
+    created_at = datetime.now(timezone.utc)
+    run_hash = config_hash(config)
+    # Microseconds plus a random suffix: two runs of the same config in the
+    # same second must not share partitions
+    run_id = f"{created_at.strftime('%Y%m%dT%H%M%S%f')}-{run_hash}-{uuid.uuid4().hex[:8]}"
+
+    df = df.with_columns(
+        pl.lit(run_id).alias('run_id'),
+        pl.lit(run_hash).alias('config_hash'),
+        pl.lit(created_at).alias('created_at'),
+    ).sort(SORT_KEYS)
+
+    entries = []
+    partitions = df.partition_by('country', 'output_variable', as_dict=True, maintain_order=True)
+    for (country, output_variable), df_part in partitions.items():
+        partition_dir = os.path.join(
+            root, table, f"run_id={run_id}", f"country={country}", f"output_variable={output_variable}"
+        )
+        os.makedirs(partition_dir, exist_ok=True)
+        path = os.path.join(partition_dir, 'results.parquet')
+        df_part.write_parquet(path, statistics=True)
+
+        entries.append({
+            'run_id': run_id,
+            'config_hash': run_hash,
+            'created_at': created_at,
+            'country': country,
+            'output_variable': output_variable,
+            'path': path,
+            'n_rows': df_part.shape[0],
+            'min_period': df_part['period'].min(),
+            'max_period': df_part['period'].max(),
+        })
+
+    # Lock so concurrent runs don't drop each other's rows, and write then
+    # rename so readers never see a half-written index
+    with index_lock(table, root):
+        index = pl.DataFrame(entries)
+        if os.path.exists(index_path(table, root)):
+            index = pl.concat([load_index(table, root), index], how='vertical_relaxed')
+        tmp_path = f"{index_path(table, root)}.{uuid.uuid4().hex}.tmp"
+        index.sort('run_id', 'country', 'output_variable').write_parquet(tmp_path)
+        os.replace(tmp_path, index_path(table, root))
+
+    print(f"Stored run {run_id} of '{table}' ({df.shape[0]} rows, {len(entries)} partitions)")
+    return run_id
+
+
+def list_runs(table, root=RESULTS_ROOT):
+    """Run metadata for every stored run of the table, oldest first."""
+    return load_index(table, root).group_by('run_id', 'config_hash', 'created_at').agg(
+        pl.col('country').n_unique().alias('n_countries'),
+        pl.col('n_rows').sum(),
+    ).sort('created_at')
+
+
+def latest_run(table, root=RESULTS_ROOT, index=None):
+    """Id of the most recently stored run of the table."""
+    if index is None:
+        index = load_index(table, root)
+    return index.sort('created_at', 'run_id')['run_id'][-1]
+
+
+def countries(table, run_id='latest', root=RESULTS_ROOT):
+    """Countries stored for a run ('latest' for the most recent run)."""
+    index = load_index(table, root)
+    if run_id == 'latest':
+        run_id = latest_run(table, root, index)
+    return index.filter(
+        pl.col('run_id') == run_id
+    )['country'].unique().sort().to_list()
+
+
+def query(table, country=None, output_variable=None, run_id='latest', columns=None, root=RESULTS_ROOT):
+    """Return results for a country and/or output variable, sorted by period.
+
+    run_id is a stored run id, 'latest' for the most recent run, or None for
+    every run (to compare runs). Only the files matching the run, country and
+    output variable are opened. Runs with different column sets (e.g. after a
+    config change) are combined with nulls for the columns a run does not have.
+    """
+    index = load_index(table, root)
+
+    if run_id == 'latest':
+        run_id = latest_run(table, root, index)
+    if run_id is not None:
+        index = index.filter(pl.col('run_id') == run_id)
+    if country is not None:
+        index = index.filter(pl.col('country') == country)
+    if output_variable is not None:
+        index = index.filter(pl.col('output_variable') == output_variable)
+
+    if index.is_empty():
+        raise ValueError(
+            f"No results for run_id={run_id} country={country} "
+            f"output_variable={output_variable} in '{table}'"
+        )
+
+    # One scan per file, since runs may differ in columns. run_id, country and
+    # output_variable are stored in the files, so skip hive path parsing.
+    lf = pl.concat(
+        [pl.scan_parquet(path, hive_partitioning=False) for path in index['path']],
+        how='diagonal_relaxed',
+    )
+    if columns is not None:
+        lf = lf.select(['run_id', *SORT_KEYS, *columns])
+
+    return lf.collect().sort('run_id', *SORT_KEYS)
@@ -1,5 +1,4 @@
 import polars as pl 
-import polars.selectors as ps
 import seaborn as sns
 import matplotlib.pyplot as plt
 import os
@@ -22,10 +21,8 @@ input_var = [
 
 output_root_dir = './analysis-constants/visualization/'
 
-df = pl.read_parquet('./Constants_prelim.parquet').filter(
-    ~pl.any_horizontal(ps.numeric().is_infinite())
-    )
-print("Done reading parquet")
+df = pl.scan_parquet('./Constants_clean.parquet')
+print("Done scanning parquet")
 
 SAMPLE_FRACTION = 0.05
 
@@ -119,7 +116,7 @@ for period in range(1, 9):
             pl.col('period') == period,
             (pl.col(var) <= 100) & 
             (pl.col(var) >= -20),
-        ).sample(
+        ).collect().sample(
             fraction=SAMPLE_FRACTION
         ).with_columns(
             pl.col('country').cast(pl.Utf8),
@@ -155,7 +152,7 @@ for period in range(1, 9):
         plt.savefig(output_dir + f'{period}.png', dpi=100, bbox_inches='tight')
     
     
-unique_country = df.select('country').unique().to_series()
+unique_country = df.select('country').unique().collect().to_series()
 
 for country in unique_country:
     for var in output_var:
@@ -165,7 +162,7 @@ for country in unique_country:
             pl.col('period') == period,
             (pl.col(var) <= 100) & 
             (pl.col(var) >= -20),
-        ).sample(
+        ).collect().sample(
             fraction=SAMPLE_FRACTION
         ).with_columns(
             pl.col('country').cast(pl.Utf8),
@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import time
+
+# Long-lived analysis worker. `serve` imports the heavy libraries and loads the
+# parquet once, then answers regression / plot jobs sent over a Unix socket, so
+# repeated ad hoc runs skip the import and load cost. The client side only uses
+# the standard library and starts instantly.
+
+def default_socket_path():
+    """Per-user socket path, so workers of different users never collide."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'regression-worker.sock')
+    return f'/tmp/regression-worker-{os.getuid()}.sock'
+
+
+SOCKET_PATH = default_socket_path()
+
+STATE = {}
+
+
+def load_state():
+    """Import the analysis stack and load the data into memory."""
+    import statsmodels.api  # noqa: F401 -- warm the import for later jobs
+    import regression
+    import resampling
+
+    STATE['regression'] = regression
+    # One pool for the worker's lifetime, so robust jobs don't pay for
+    # spawning interpreters and importing numpy/scipy each time
+    if 'executor' not in STATE:
+        n_workers = os.cpu_count() or 1
+        executor = resampling.make_executor(n_workers)
+        for future in [executor.submit(resampling.warm_up) for _ in range(n_workers)]:
+            future.result()
+        STATE['executor'] = executor
+    STATE['df'] = regression.load_data()
+    print(f"Loaded {STATE['df'].shape[0]} rows from {regression.CONFIG['data_file']}")
+
+
+def run_job(job):
+    """Run a single job against the in-memory data and return its result."""
+    kind = job.get('job')
+
+    if kind == 'reload':
+        load_state()
+        return {'n_rows': STATE['df'].shape[0]}
+
+    if kind not in ('regression', 'plot'):
+        raise ValueError(f"Unknown job type: {kind}")
+
+    regression = STATE['regression']
+    df = STATE['df']
+
+    combinations = regression.get_unique_combinations(df)
+    if job.get('country') is not None:
+        combinations = [(c, p) for c, p in combinations if c == job['country']]
+    if job.get('period') is not None:
+        combinations = [(c, p) for c, p in combinations if p == int(job['period'])]
+    if not combinations:
+        raise ValueError(f"No data for country={job.get('country')} period={job.get('period')}")
+
+    # Robust columns are opt-in: ad hoc calls want the fast OLS fit
+    final_df = regression.run_combinations(
+        df,
+        sorted(combinations),
+        plot=(kind == 'plot'),
+        robust=job.get('robust', False),
+        executor=STATE['executor'],
+    )
+    return final_df.sort('country', 'period', 'output_variable').to_dicts()
+
+
+class JobHandler(socketserver.StreamRequestHandler):
+    """Read one JSON job per line and write one JSON response per line."""
+
+    def handle(self):
+        for line in self.rfile:
+            start = time.time()
+            try:
+                job = json.loads(line)
+                if job.get('job') == 'shutdown':
+                    self.reply({'status': 'ok', 'result': None})
+                    self.server.shutdown_requested = True
+                    return
+                response = {'status': 'ok', 'result': run_job(job)}
+            except Exception as e:
+                response = {'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+            response['elapsed'] = time.time() - start
+            self.reply(response)
+
+    def reply(self, response):
+        self.wfile.write((json.dumps(response, default=str) + "\n").encode())
+        self.wfile.flush()
+
+
+def serve(socket_path=SOCKET_PATH):
+    """Start the worker and block until a shutdown job is received."""
+    if os.path.exists(socket_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(socket_path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.remove(socket_path)  # stale socket from a worker that died
+            else:
+                raise RuntimeError(f"A worker is already running on {socket_path}")
+
+    load_state()
+
+    # Only the owner may send jobs: plot writes files, shutdown stops the worker
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(socket_path, JobHandler)
+    finally:
+        os.umask(old_umask)
+    os.chmod(socket_path, 0o600)
+
+    with server:
+        server.shutdown_requested = False
+        print(f"Worker listening on {socket_path}")
+        try:
+            while not server.shutdown_requested:
+                server.handle_request()
+        finally:
+            os.remove(socket_path)
+            if 'executor' in STATE:
+                STATE.pop('executor').shutdown()
+
+    print("Worker stopped")
+
+
+def submit(job, socket_path=SOCKET_PATH):
+    """Send a job to a running worker and return its decoded response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile('rwb') as stream:
+            stream.write((json.dumps(job) + "\n").encode())
+            stream.flush()
+            return json.loads(stream.readline())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm regression worker over a Unix socket.")
+    parser.add_argument('job', choices=['serve', 'regression', 'plot', 'reload', 'shutdown'])
+    parser.add_argument('--country')
+    parser.add_argument('--period', type=int)
+    parser.add_argument('--robust', action='store_true',
+                        help="add the HC and bootstrap columns, as regression.py does")
+    parser.add_argument('--socket', default=SOCKET_PATH)
+    args = parser.parse_args()
+
+    if args.job == 'serve':
+        serve(args.socket)
+        return
+
+    response = submit(
+        {'job': args.job, 'country': args.country, 'period': args.period, 'robust': args.robust},
+        args.socket,
+    )
+    if response['status'] != 'ok':
+        print(f"Error: {response['error']}", file=sys.stderr)
+        sys.exit(1)
+
+    print(json.dumps(response['result'], indent=2))
+    print(f"Time elapsed: {response['elapsed']} seconds")
+
+
+if __name__ == "__main__":
+    main()